@@ -3,6 +3,7 @@ Critical Path Calculator Module
 Calculates the critical path of a project using network analysis
 """
 import networkx as nx
+import numpy as np
 import json
 import matplotlib.pyplot as plt
 from io import BytesIO
@@ -20,10 +21,14 @@ class CriticalPathCalculator:
         self.tasks = tasks or []
         self.critical_path_ids = set(critical_path or [])
         
-        # Initialize calculation attributes
-        self.earliest_start_times = {}
-        self.latest_start_times = {}
-        self.slack_times = {}
+        # Schedule arrays aligned with self._ids, filled by _compute_schedule
+        self._es = None
+        self._ls = None
+        self._slack = None
+        
+        # Dependency graph, built on first use
+        self._G = None
+        self._schedule = None
         
         # Build task map for easy lookup
         self.task_map = {}
@@ -32,6 +37,28 @@ class CriticalPathCalculator:
     def _build_task_map(self):
         """Build a map of task ID to task object for quick lookups"""
         self.task_map = {task.get('id'): task for task in self.tasks}
+        self._durations = {tid: task.get('duree_estimee', 0) for tid, task in self.task_map.items()}
+        self._ids = list(self.task_map)
+        self._id_to_idx = {tid: i for i, tid in enumerate(self._ids)}
+    
+    @property
+    def earliest_start_times(self):
+        """Earliest start time by task ID"""
+        return self._as_task_dict(self._compute_schedule()[0])
+    
+    @property
+    def latest_start_times(self):
+        """Latest start time by task ID"""
+        return self._as_task_dict(self._compute_schedule()[1])
+    
+    @property
+    def slack_times(self):
+        """Slack time by task ID"""
+        return self._as_task_dict(self._compute_schedule()[2])
+    
+    def _as_task_dict(self, values):
+        """Map an array aligned with self._ids back to a task ID dict"""
+        return dict(zip(self._ids, values.tolist()))
     
     def get_critical_path(self):
         """
@@ -43,46 +70,12 @@ class CriticalPathCalculator:
         if not self.tasks:
             return []
         
-        # Build directed graph
-        G = self._build_graph()
-        
-        # Check for cycles (critical path only valid for DAGs)
-        try:
-            cycles = list(nx.simple_cycles(G))
-            if cycles:
-                # Handle cycles by removing the lowest weight edge in each cycle
-                for cycle in cycles:
-                    self._break_cycle(G, cycle)
-        except nx.NetworkXNoCycle:
-            pass  # No cycles detected
-        
-        # Find all paths and get the longest (critical path)
-        paths = []
-        start_nodes = [node for node in G.nodes() if G.in_degree(node) == 0]
-        end_nodes = [node for node in G.nodes() if G.out_degree(node) == 0]
+        # Single tasks and simple chains don't need a graph
+        chain = self._get_linear_chain()
+        if chain is not None:
+            return chain
         
-        # If no clear start/end, the graph might be empty or malformed
-        if not start_nodes or not end_nodes:
-            return []
-        
-        # Find all paths from each start node to each end node
-        for start in start_nodes:
-            for end in end_nodes:
-                try:
-                    for path in nx.all_simple_paths(G, start, end):
-                        path_weight = sum(self.task_map[node].get('duree_estimee', 0) 
-                                         if node in self.task_map else 0 
-                                         for node in path)
-                        paths.append((path, path_weight))
-                except (nx.NetworkXNoPath, nx.NodeNotFound):
-                    continue
-        
-        # Return the path with the highest total weight
-        if paths:
-            critical_path, _ = max(paths, key=lambda x: x[1])
-            return list(critical_path)
-        
-        return []
+        return list(self._compute_schedule()[3])
     
     def get_critical_path_details(self):
         """
@@ -91,7 +84,8 @@ class CriticalPathCalculator:
         Returns:
             dict: Critical path details including tasks, duration, etc.
         """
-        path_ids = self.get_critical_path()
+        _, _, slack, path_ids, _ = self._compute_schedule()
+        slack_times = self.slack_times
         critical_tasks = [self.task_map[tid] for tid in path_ids if tid in self.task_map]
         
         # Determine the duration unit from tasks
@@ -106,26 +100,23 @@ class CriticalPathCalculator:
                 
         total_duration = sum(task.get('duree_estimee', 0) for task in critical_tasks)
         
-        # Calculate slack time for all tasks
-        slack_times = self._calculate_slack_times()
+        critical_mask = self._critical_mask(path_ids)
         
         # Identify near-critical tasks (tasks with slack <= 2 days)
-        near_critical_tasks = []
-        for task_id, slack in slack_times.items():
-            if task_id not in path_ids and slack <= 2 and task_id in self.task_map:
-                task_copy = self.task_map[task_id].copy()
-                task_copy['slack'] = slack
-                near_critical_tasks.append(task_copy)
+        near_critical_tasks = [{**self.task_map[self._ids[i]], 'slack': slack_times[self._ids[i]]}
+                               for i in np.flatnonzero(~critical_mask & (slack <= 2))]
         
         # Generate visualization data for critical and near-critical paths
-        visualization_data = self._generate_path_visualization_data(path_ids, slack_times)
+        visualization_data = self._generate_path_visualization_data(path_ids)
         
         # Find potential bottlenecks (tasks on critical path with longest duration)
         bottlenecks = []
         if critical_tasks:
             avg_duration = total_duration / len(critical_tasks)
-            bottlenecks = [task for task in critical_tasks 
-                          if task.get('duree_estimee', 0) > avg_duration * 1.5]
+            critical_durations = np.fromiter((task.get('duree_estimee', 0) for task in critical_tasks),
+                                             dtype=float, count=len(critical_tasks))
+            bottlenecks = [critical_tasks[i]
+                           for i in np.flatnonzero(critical_durations > avg_duration * 1.5)]
         
         return {
             "critical_path": critical_tasks,
@@ -138,6 +129,38 @@ class CriticalPathCalculator:
             "bottlenecks": bottlenecks
         }
     
+    def _get_linear_chain(self):
+        """
+        Order the tasks if they form a single dependency chain
+        
+        Returns:
+            list: Task IDs from first to last, or None if the project
+            is not a simple chain
+        """
+        if len(self.task_map) != len(self.tasks):
+            return None
+        
+        successor = {}
+        first_task = None
+        for task in self.tasks:
+            predecessors = [p for p in task.get('predecesseurs', []) if p in self.task_map]
+            if not predecessors:
+                if first_task is not None:
+                    return None
+                first_task = task.get('id')
+            elif len(predecessors) > 1 or predecessors[0] in successor:
+                return None
+            else:
+                successor[predecessors[0]] = task.get('id')
+        
+        chain = []
+        task_id = first_task
+        while task_id is not None:
+            chain.append(task_id)
+            task_id = successor.get(task_id)
+        
+        return chain if len(chain) == len(self.tasks) else None
+    
     def _build_graph(self):
         """
         Build directed graph from tasks and dependencies
@@ -145,21 +168,51 @@ class CriticalPathCalculator:
         G = nx.DiGraph()
         
         # Add all tasks as nodes with weight attribute
-        for task in self.tasks:
-            task_id = task.get('id')
-            G.add_node(task_id, weight=task.get('duree_estimee', 0))
+        G.add_nodes_from((task_id, {'weight': duration})
+                         for task_id, duration in self._durations.items())
         
         # Add edges based on task dependencies
-        for task in self.tasks:
-            task_id = task.get('id')
-            predecessors = task.get('predecesseurs', [])
-            
-            for pred_id in predecessors:
-                if G.has_node(pred_id):
-                    G.add_edge(pred_id, task_id)
+        G.add_edges_from((pred_id, task.get('id'))
+                         for task in self.tasks
+                         for pred_id in task.get('predecesseurs', [])
+                         if pred_id in self.task_map)
         
         return G
     
+    def _ensure_graph(self):
+        """
+        Build the acyclic dependency graph once and cache it
+        
+        Returns:
+            networkx.DiGraph: Acyclic dependency graph
+        """
+        if self._G is None:
+            G = self._build_graph()
+            if not nx.is_directed_acyclic_graph(G):
+                self._make_acyclic(G)
+            self._G = G
+        
+        return self._G
+    
+    def _make_acyclic(self, G):
+        """
+        Break cycles until the graph is a DAG
+        
+        Each pass finds one cycle per strongly connected component and
+        removes its lowest weight edge, so cycles are never enumerated.
+        
+        Args:
+            G (networkx.DiGraph): Directed graph, modified in place
+        """
+        # Self-dependencies can't be broken by _break_cycle
+        G.remove_edges_from(list(nx.selfloop_edges(G)))
+        
+        while not nx.is_directed_acyclic_graph(G):
+            for component in list(nx.strongly_connected_components(G)):
+                if len(component) > 1:
+                    cycle = [u for u, _ in nx.find_cycle(G.subgraph(component))]
+                    self._break_cycle(G, cycle)
+    
     def _break_cycle(self, G, cycle):
         """
         Break a cycle in the graph by removing the lowest weight edge
@@ -180,7 +233,7 @@ class CriticalPathCalculator:
             node2 = cycle[(i + 1) % len(cycle)]
             
             if G.has_edge(node1, node2):
-                weight1 = self.task_map[node1].get('duree_estimee', 0) if node1 in self.task_map else 0
+                weight1 = self._durations.get(node1, 0)
                 if weight1 < min_weight:
                     min_weight = weight1
                     min_edge = (node1, node2)
@@ -189,20 +242,79 @@ class CriticalPathCalculator:
         if min_edge:
             G.remove_edge(*min_edge)
     
-    def _calculate_slack_times(self):
-        """Calculate slack time for each task in the project"""
-        if not self.earliest_start_times:
-            self._calculate_earliest_start_times()
+    def _compute_schedule(self):
+        """
+        Run the forward and backward CPM passes once and cache the results
         
-        if not self.latest_start_times:
-            self._calculate_latest_start_times()
-            
-        slack_times = {}
-        for task_id in self.task_map:
-            if task_id in self.earliest_start_times and task_id in self.latest_start_times:
-                slack_times[task_id] = self.latest_start_times[task_id] - self.earliest_start_times[task_id]
+        Tasks are addressed by their index in self._ids so both passes work
+        on plain lists; the results are stored as arrays and only turned
+        into task ID dicts by the public properties. The critical path is
+        recovered from the forward pass by walking back from the last task
+        to finish through the predecessors that set each earliest start,
+        so no path enumeration is needed.
+        
+        Returns:
+            tuple: (earliest start array, latest start array, slack array,
+                    critical path IDs, project end)
+        """
+        if self._schedule is not None:
+            return self._schedule
+        
+        n = len(self._ids)
+        durations = list(self._durations.values())
+        earliest_start = [0] * n
+        latest_start = [0] * n
+        critical_path = []
+        project_finish = 0
         
-        return slack_times
+        if n:
+            G = self._ensure_graph()
+            idx = self._id_to_idx
+            order = [idx[task_id] for task_id in nx.topological_sort(G)]
+            predecessors = [[idx[pred] for pred in G.predecessors(task_id)] for task_id in self._ids]
+            successors = [[idx[succ] for succ in G.successors(task_id)] for task_id in self._ids]
+            
+            # Forward pass: earliest start is the latest predecessor finish
+            for i in order:
+                max_pred_finish = 0
+                for pred in predecessors[i]:
+                    max_pred_finish = max(max_pred_finish, earliest_start[pred] + durations[pred])
+                earliest_start[i] = max_pred_finish
+            
+            # Project ends when the last task without successors finishes
+            end_task = None
+            for i in range(n):
+                if not successors[i]:
+                    task_finish = earliest_start[i] + durations[i]
+                    if end_task is None or task_finish > project_finish:
+                        end_task = i
+                        project_finish = task_finish
+            
+            # Backward pass: latest start is the earliest successor latest start
+            for i in reversed(order):
+                latest_finish = min((latest_start[succ] for succ in successors[i]),
+                                    default=project_finish)
+                latest_start[i] = latest_finish - durations[i]
+            
+            # Walk back from the end through the predecessors driving each start
+            i = end_task
+            while i is not None:
+                critical_path.append(self._ids[i])
+                i = next((pred for pred in predecessors[i]
+                          if earliest_start[pred] + durations[pred] == earliest_start[i]),
+                         None)
+            critical_path.reverse()
+        
+        self._es = np.array(earliest_start)
+        self._ls = np.array(latest_start)
+        self._slack = self._ls - self._es
+        self._schedule = (self._es, self._ls, self._slack, critical_path, project_finish)
+        
+        return self._schedule
+    
+    def _calculate_slack_times(self):
+        """Calculate slack time for each task in the project"""
+        return self.slack_times
         
     def calculate_slack_times(self):
         """Public method to calculate slack time for each task in the project"""
@@ -210,275 +322,31 @@ class CriticalPathCalculator:
     
     def _calculate_earliest_start_times(self):
         """Calculate earliest start times for each task in the project"""
-        G = self._build_graph()
-        
-        # Check for cycles and break them
-        cycles = list(nx.simple_cycles(G))
-        if cycles:
-            for cycle in cycles:
-                self._break_cycle(G, cycle)
-        
-        # Reset the earliest start times dictionary
-        self.earliest_start_times = {}
-        
-        # Topologically sort tasks
-        try:
-            sorted_tasks = list(nx.topological_sort(G))
-            
-            # Compute earliest start time for each task
-            for task_id in sorted_tasks:
-                # Skip non-task nodes
-                if task_id not in self.task_map:
-                    continue
-                    
-                # Maximum of earliest finish times of predecessors
-                max_pred_finish = 0
-                for pred in G.predecessors(task_id):
-                    if pred in self.earliest_start_times and pred in self.task_map:
-                        pred_finish = self.earliest_start_times[pred] + self.task_map[pred].get('duree_estimee', 0)
-                        max_pred_finish = max(max_pred_finish, pred_finish)
-                
-                self.earliest_start_times[task_id] = max_pred_finish
-            
-            return self.earliest_start_times
-        
-        except nx.NetworkXUnfeasible:
-            # Graph has cycles, can't calculate earliest start times
-            return {}
+        return self.earliest_start_times
+    
     def _calculate_latest_start_times(self):
         """Calculate latest start times for each task in the project"""
-        if not self.earliest_start_times:
-            self._calculate_earliest_start_times()
-            
-        # Find project end time    
-        project_finish = 0
-        for task_id in self.task_map:
-            if task_id in self.earliest_start_times:
-                task_finish = self.earliest_start_times[task_id] + self.task_map[task_id].get('duree_estimee', 0)
-                project_finish = max(project_finish, task_finish)
-        
-        G = self._build_graph()
-        
-        # Check for cycles and break them
-        cycles = list(nx.simple_cycles(G))
-        if cycles:
-            for cycle in cycles:
-                self._break_cycle(G, cycle)
-        
-        # Reset the latest start times dictionary
-        self.latest_start_times = {}
-        
-        # Topologically sort tasks
-        try:
-            sorted_tasks = list(nx.topological_sort(G))
-            
-            # Initialize latest finish for all tasks to project end
-            for task_id in self.task_map:
-                if task_id not in self.latest_start_times:
-                    has_successors = False
-                    for succ in G.successors(task_id):
-                        has_successors = True
-                        break
-                    
-                    # Tasks with no successors can finish at project end
-                    if not has_successors:
-                        task_duration = self.task_map[task_id].get('duree_estimee', 0)
-                        self.latest_start_times[task_id] = project_finish - task_duration
+        return self.latest_start_times
             
-            # Calculate latest start for each task (backward pass)
-            for task_id in reversed(sorted_tasks):
-                if task_id not in self.task_map:
-                    continue
-                
-                task_duration = self.task_map[task_id].get('duree_estimee', 0)
-                successors = list(G.successors(task_id))
-                
-                if successors:
-                    # Minimum of latest start times of successors
-                    min_succ_start = float('inf')
-                    for succ in successors:
-                        if succ in self.latest_start_times:
-                            min_succ_start = min(min_succ_start, self.latest_start_times[succ])
-                    
-                    if min_succ_start != float('inf'):
-                        self.latest_start_times[task_id] = min_succ_start - task_duration
-            
-            return self.latest_start_times
-        
-        except nx.NetworkXUnfeasible:
-            # Graph has cycles, can't calculate latest start times
-            return {}
-            
-    def generate_network_diagram(self):
-        """Generate a network diagram visualization as base64 encoded PNG"""
-        # Use Agg backend which doesn't require a display
-        matplotlib.use('Agg')
-        
-        # Create directed graph
-        G = self._build_graph()
-        
-        # Get critical path for highlighting
-        critical_path = self.get_critical_path()
-        # Generate critical path edges when we have at least 2 tasks in the path
-        critical_path_edges = []
-        if len(critical_path) >= 2:
-            critical_path_edges = [(critical_path[i], critical_path[i+1]) for i in range(len(critical_path)-1)]
-        
-        # Set up the figure
-        plt.figure(figsize=(12, 8))
-        
-        # Create layout for nodes
-        pos = nx.spring_layout(G)
-        
-        # Draw regular edges and nodes
-        nx.draw_networkx_edges(G, pos, edgelist=[e for e in G.edges if e not in critical_path_edges],
-                             edge_color='gray', arrows=True)
-        
-        # Draw critical path edges
-        if critical_path_edges:
-            nx.draw_networkx_edges(G, pos, edgelist=critical_path_edges, 
-                                 edge_color='red', width=2.0, arrows=True)
-        
-        # Draw nodes with different colors for critical path
-        regular_nodes = [n for n in G.nodes if n not in critical_path]
-        critical_nodes = [n for n in G.nodes if n in critical_path]
-        
-        nx.draw_networkx_nodes(G, pos, nodelist=regular_nodes, node_color='lightblue', 
-                              node_size=500, alpha=0.8)
-        nx.draw_networkx_nodes(G, pos, nodelist=critical_nodes, node_color='lightcoral', 
-                              node_size=600, alpha=0.8)
-        
-        # Add labels
-        labels = {}
-        for node in G.nodes:
-            if node in self.task_map:
-                task_name = self.task_map[node].get('nom', '')
-                if task_name and len(task_name) > 10:
-                    task_name = task_name[:10] + '...'
-                labels[node] = f"{node}\n{task_name}"
-            else:
-                labels[node] = str(node)
-                
-        nx.draw_networkx_labels(G, pos, labels=labels)
-        
-        # Add legend
-        plt.plot([0], [0], '-', color='red', label='Critical Path', linewidth=2)
-        plt.plot([0], [0], '-', color='gray', label='Normal Path')
-        plt.plot([0], [0], 'o', color='lightcoral', label='Critical Task')
-        plt.plot([0], [0], 'o', color='lightblue', label='Normal Task')
-        plt.legend()
-        
-        plt.title('Project Network Diagram with Critical Path')
-        plt.axis('off')
-        
-        # Save figure to a BytesIO object
-        buffer = BytesIO()
-        plt.savefig(buffer, format='png', dpi=100)
-        plt.close()
-        
-        # Encode the PNG as base64
-        buffer.seek(0)
-        image_data = base64.b64encode(buffer.read()).decode('utf-8')
-        
-        return {
-            'image': image_data,
-            'format': 'png',
-            'encoding': 'base64'
-        }
-        
-    def get_advanced_analysis(self):
-        """Generate advanced schedule analysis with slack times and critical path details"""
-        # Calculate critical path and slack times
-        cp_ids = self.get_critical_path()
-        slack_times = self._calculate_slack_times()
-        self.slack_times = slack_times  # Store for reuse
-        
-        # Calculate earliest and latest start times
-        self._calculate_earliest_start_times()
-        self._calculate_latest_start_times()
-        
-        # Prepare detailed task schedule information
-        tasks_schedule = []
-        for task_id, task in self.task_map.items():
-            duration = task.get('duree_estimee', 0)
-            earliest_start = self.earliest_start_times.get(task_id, 0)
-            latest_start = self.latest_start_times.get(task_id, 0)
-            slack = slack_times.get(task_id, 0)
-            
-            tasks_schedule.append({
-                'task_id': task_id,
-                'task_name': task.get('nom', task.get('name', '')),
-                'duration': duration,
-                'earliest_start': earliest_start,
-                'earliest_finish': earliest_start + duration,
-                'latest_start': latest_start,
-                'latest_finish': latest_start + duration,
-                'slack': slack,
-                'is_critical': task_id in cp_ids
-            })
+    def _critical_mask(self, path_ids):
+        """
+        Mark critical path tasks for vectorized filtering
         
-        # Identify bottlenecks (tasks on critical path with long durations)
-        bottlenecks = []
-        if self.tasks:
-            avg_duration = sum(task.get('duree_estimee', 0) for task in self.tasks) / len(self.tasks)
+        Args:
+            path_ids (list): Critical path task IDs
             
-            for task_id in cp_ids:
-                if task_id in self.task_map:
-                    task = self.task_map[task_id]
-                    duration = task.get('duree_estimee', 0)
-                    if duration > avg_duration * 1.5:  # 50% longer than average
-                        bottlenecks.append({
-                            'task_id': task_id,
-                            'task_name': task.get('nom', task.get('name', '')),
-                            'duration': duration,
-                            'impact_factor': duration / avg_duration
-                        })
-        
-        # Find near-critical tasks (small slack)
-        near_critical = []
-        for task_id, slack in slack_times.items():
-            if 0 < slack <= 2 and task_id in self.task_map:
-                task = self.task_map[task_id]
-                near_critical.append({
-                    'task_id': task_id,
-                    'task_name': task.get('nom', task.get('name', '')),
-                    'slack': slack
-                })
-        
-        # Calculate project statistics
-        critical_tasks_count = len(cp_ids)
-        total_tasks = len(self.tasks)
-        critical_duration = sum(self.task_map[tid].get('duree_estimee', 0) for tid in cp_ids if tid in self.task_map)
-        total_duration = sum(task.get('duree_estimee', 0) for task in self.tasks)
-        avg_slack = sum(slack_times.values()) / len(slack_times) if slack_times else 0
-        
-        # Generate path visualization data
-        path_visualization = self._generate_path_visualization_data(cp_ids, slack_times)
-        
-        # Return comprehensive analysis
-        return {
-            'task_schedule': tasks_schedule,
-            'critical_path': cp_ids,
-            'bottlenecks': bottlenecks,
-            'near_critical_tasks': near_critical,
-            'project_statistics': {
-                'critical_ratio': critical_tasks_count / total_tasks if total_tasks else 0,
-                'duration_on_critical_path': critical_duration,
-                'total_project_duration': critical_duration,  # Project duration is the critical path duration
-                'critical_path_tasks': critical_tasks_count,
-                'total_tasks': total_tasks,
-                'average_slack': avg_slack
-            },
-            'path_visualization': path_visualization
-        }
+        Returns:
+            numpy.ndarray: Boolean mask aligned with self._ids
+        """
+        mask = np.zeros(len(self._ids), dtype=bool)
+        mask[[self._id_to_idx[tid] for tid in path_ids if tid in self._id_to_idx]] = True
+        return mask
     
-    def _generate_path_visualization_data(self, path_ids, slack_times):
+    def _generate_path_visualization_data(self, path_ids):
         """Generate visualization data for critical and near-critical paths"""
         visualization_data = []
-        
-        # First make sure we have valid slack times
-        if not slack_times:
-            slack_times = self._calculate_slack_times()
+        slack = self._compute_schedule()[2]
+        slack_list = slack.tolist()
             
         # Process critical path tasks
         for task_id in path_ids:
@@ -488,58 +356,78 @@ class CriticalPathCalculator:
                     'task_id': task_id,
                     'task_name': task.get('nom', task.get('name', '')),
                     'duration': task.get('duree_estimee', 0),
-                    'slack': slack_times.get(task_id, 0),
+                    'slack': slack_list[self._id_to_idx[task_id]],
                     'is_critical': True
                 })
         
         # Add near-critical path tasks
-        for task_id, slack in slack_times.items():
-            if task_id not in path_ids and slack <= 2 and task_id in self.task_map:
-                task = self.task_map[task_id]
-                visualization_data.append({
-                    'task_id': task_id,
-                    'task_name': task.get('nom', task.get('name', '')),
-                    'duration': task.get('duree_estimee', 0),
-                    'slack': slack,
-                    'is_critical': False
-                })
+        for i in np.flatnonzero(~self._critical_mask(path_ids) & (slack <= 2)):
+            task_id = self._ids[i]
+            task = self.task_map[task_id]
+            visualization_data.append({
+                'task_id': task_id,
+                'task_name': task.get('nom', task.get('name', '')),
+                'duration': task.get('duree_estimee', 0),
+                'slack': slack_list[i],
+                'is_critical': False
+            })
         
         return visualization_data
         
-    def generate_network_diagram(self):
-        """Generate a network diagram visualization of the project"""
+    def generate_network_diagram(self, dpi=72):
+        """
+        Generate a network diagram visualization of the project
+        
+        Args:
+            dpi (int): Output resolution, defaults to a web preview size
+        """
         G = self._build_graph()
-        path_ids = set(self.get_critical_path())
-        
-        # Create node colors - red for critical path, blue for others
-        colors = []
-        labels = {}
-        
-        for node in G.nodes():
-            if node in self.task_map:
-                task = self.task_map[node]
-                labels[node] = f"{task.get('nom', task.get('name', ''))}\n{task.get('duree_estimee', 0)} days"
-                if node in path_ids:
-                    colors.append('red')
-                else:
-                    colors.append('skyblue')
-            else:
-                labels[node] = str(node)
-                colors.append('skyblue')
+        critical_path = self.get_critical_path()
+        path_ids = set(critical_path)
+        critical_edges = set(zip(critical_path, critical_path[1:]))
+        
+        nodes = list(G.nodes())
+        edges = list(G.edges())
+        critical_mask = np.fromiter((node in path_ids for node in nodes), dtype=bool, count=len(nodes))
+        labels = [f"{self.task_map[node].get('nom', self.task_map[node].get('name', ''))}\n"
+                  f"{self._durations[node]} days" for node in nodes]
         
         # Create a BytesIO object to save the figure
         buffer = BytesIO()
         
-        plt.figure(figsize=(12, 8))
-        pos = nx.spring_layout(G)  # positions for all nodes
-        
-        # Draw the graph with specified node colors
-        nx.draw(G, pos, node_color=colors, with_labels=False, node_size=500, arrows=True)
-        nx.draw_networkx_labels(G, pos, labels=labels, font_size=10)
-        
-        plt.title('Project Network Diagram')
-        plt.savefig(buffer, format='png')
-        plt.close()
+        with plt.rc_context({'path.simplify_threshold': 1.0}):
+            fig, ax = plt.subplots(figsize=(8, 5), dpi=dpi)
+            pos = nx.spring_layout(G)  # positions for all nodes
+            
+            if nodes:
+                node_xy = np.array([pos[node] for node in nodes])
+                
+                # All dependencies as one quiver, critical path edges in red
+                if edges:
+                    node_index = {node: i for i, node in enumerate(nodes)}
+                    tails = node_xy[[node_index[u] for u, _ in edges]]
+                    heads = node_xy[[node_index[v] for _, v in edges]]
+                    vectors = heads - tails
+                    lengths = np.hypot(vectors[:, 0], vectors[:, 1])
+                    # Stop arrows at roughly the node marker radius
+                    shrink = np.clip(1 - 0.07 / np.where(lengths > 0, lengths, 1), 0, 1)
+                    vectors *= shrink[:, None]
+                    edge_colors = ['red' if edge in critical_edges else 'gray' for edge in edges]
+                    ax.quiver(tails[:, 0], tails[:, 1], vectors[:, 0], vectors[:, 1], color=edge_colors,
+                              angles='xy', scale_units='xy', scale=1, width=0.003, zorder=1)
+                
+                # All nodes in a single scatter - red for critical path, blue for others
+                ax.scatter(node_xy[:, 0], node_xy[:, 1], s=500, zorder=2,
+                           c=np.where(critical_mask, 'red', 'skyblue'))
+                
+                for (x, y), label in zip(node_xy, labels):
+                    ax.text(x, y, label, fontsize=10, ha='center', va='center', clip_on=False, zorder=3)
+            
+            ax.set_axis_off()
+            ax.set_title('Project Network Diagram')
+            fig.savefig(buffer, format='png', dpi=dpi, bbox_inches='tight', pad_inches=0.1,
+                        pil_kwargs={'optimize': True})
+            plt.close(fig)
         
         # Encode the image to base64 string
         buffer.seek(0)
@@ -552,22 +440,17 @@ class CriticalPathCalculator:
         
     def get_advanced_analysis(self):
         """Get advanced analysis of the project schedule"""
-        # Calculate slack times
-        slack_times = self._calculate_slack_times()
-        
-        # Identify critical path
-        path_ids = self.get_critical_path()
-        
-        # Calculate earliest and latest start/finish times for all tasks
-        earliest_start = self._calculate_earliest_start_times()
-        latest_start = self._calculate_latest_start_times()
+        # Calculate start times, slack times and critical path in one pass
+        earliest_start, latest_start, slack, path_ids, _ = self._compute_schedule()
+        critical_mask = self._critical_mask(path_ids)
         
         # Prepare detailed task schedule information
         task_schedule = []
-        for task_id, task in self.task_map.items():
-            es = earliest_start.get(task_id, 0)
-            ls = latest_start.get(task_id, 0)
-            duration = task.get('duree_estimee', 0)
+        for task_id, es, ls, task_slack, is_critical in zip(
+                self._ids, earliest_start.tolist(), latest_start.tolist(),
+                slack.tolist(), critical_mask.tolist()):
+            task = self.task_map[task_id]
+            duration = self._durations[task_id]
             
             task_schedule.append({
                 'task_id': task_id,
@@ -577,8 +460,8 @@ class CriticalPathCalculator:
                 'earliest_finish': es + duration,
                 'latest_start': ls,
                 'latest_finish': ls + duration,
-                'slack': slack_times.get(task_id, 0),
-                'is_critical': task_id in path_ids
+                'slack': task_slack,
+                'is_critical': is_critical
             })
             
         # Calculate project statistics
@@ -592,6 +475,6 @@ class CriticalPathCalculator:
                 'total_tasks': total_tasks,
                 'critical_tasks': critical_task_count,
                 'critical_ratio': critical_ratio,
-                'avg_slack': sum(slack_times.values()) / len(slack_times) if slack_times else 0
+                'avg_slack': float(slack.mean()) if slack.size else 0
             }
         }
@@ -2,11 +2,197 @@
 Gantt Chart Visualizer Module
 Creates visual representation of project tasks timeline
 """
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
 from datetime import datetime, timedelta
+from collections import defaultdict, OrderedDict
+from io import BytesIO
+import hashlib
+import heapq
+import math
+import threading
+
 import numpy as np
 
+# Whether the scheduling kernels below are compiled: None until the first
+# large project, False when numba is not installed
+_kernels_compiled = None
+_kernels_lock = threading.Lock()
+
+# Compiled versions of the _*_py kernels, set by _compile_kernels; the
+# kernels call each other through these names
+_heap_push = _heap_pop = _schedule_kernel = None
+
+
+def _compile_kernels():
+    """
+    Compile the scheduling kernels with numba on first use
+    
+    numba is only imported here, so callers that never schedule a large
+    project don't pay for importing it.
+    
+    Returns:
+        bool: Whether the compiled kernels are available
+    """
+    global _kernels_compiled, _heap_push, _heap_pop, _schedule_kernel
+    with _kernels_lock:
+        if _kernels_compiled is None:
+            try:
+                from numba import njit
+            except ImportError:  # optional, only used to schedule large projects
+                _kernels_compiled = False
+            else:
+                # Helpers first, so the kernels calling them resolve the compiled versions
+                _heap_push = njit(cache=True)(_heap_push_py)
+                _heap_pop = njit(cache=True)(_heap_pop_py)
+                _schedule_kernel = njit(cache=True)(_schedule_kernel_py)
+                _kernels_compiled = True
+        return _kernels_compiled
+
+
+def _heap_push_py(heap, size, value):
+    """Push value onto a binary min-heap stored in heap[:size], return new size"""
+    i = size
+    heap[i] = value
+    while i > 0:
+        parent = (i - 1) // 2
+        if heap[parent] <= heap[i]:
+            break
+        heap[parent], heap[i] = heap[i], heap[parent]
+        i = parent
+    return size + 1
+
+
+def _heap_pop_py(heap, size):
+    """Pop the smallest value from the min-heap in heap[:size]"""
+    top = heap[0]
+    size -= 1
+    heap[0] = heap[size]
+    i = 0
+    while True:
+        child = 2 * i + 1
+        if child >= size:
+            break
+        if child + 1 < size and heap[child + 1] < heap[child]:
+            child += 1
+        if heap[i] <= heap[child]:
+            break
+        heap[i], heap[child] = heap[child], heap[i]
+        i = child
+    return top
+
+
+def _schedule_kernel_py(indptr, successors, in_degree, durations):
+    """
+    Kahn's algorithm over a CSR successor graph of task indices
+    
+    Mirrors the pure Python loop in GanttVisualizer._schedule_tasks: ready
+    tasks are released lowest index first, and scheduling stops early when
+    the remaining tasks form a cycle.
+    
+    Returns:
+        tuple: (task indices in schedule order, start day offsets,
+            number of tasks scheduled)
+    """
+    n = in_degree.shape[0]
+    in_degree = in_degree.copy()
+    start_days = np.zeros(n, np.float64)
+    order = np.empty(n, np.int64)
+    heap = np.empty(n, np.int64)
+    size = 0
+    for i in range(n):
+        if in_degree[i] == 0:
+            size = _heap_push(heap, size, i)
+    
+    count = 0
+    while size > 0:
+        u = _heap_pop(heap, size)
+        size -= 1
+        order[count] = u
+        count += 1
+        
+        end = start_days[u] + durations[u]
+        for j in range(indptr[u], indptr[u + 1]):
+            v = successors[j]
+            if end > start_days[v]:
+                start_days[v] = end
+            in_degree[v] -= 1
+            if in_degree[v] == 0:
+                size = _heap_push(heap, size, v)
+    
+    return order, start_days, count
+
+
+def _find_dependency_cycles(task_ids, successors):
+    """
+    Find groups of tasks that depend on each other in a cycle
+    
+    Iterative Tarjan's algorithm, so deep dependency chains cannot hit the
+    recursion limit.
+    
+    Args:
+        task_ids (list): Task IDs to search from
+        successors (dict): Successor IDs by task ID
+        
+    Returns:
+        list: Strongly connected components with more than one task
+    """
+    index = {}
+    lowlink = {}
+    stack = []
+    on_stack = set()
+    cycles = []
+    
+    for root in task_ids:
+        if root in index:
+            continue
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(successors.get(root, ())))]
+        
+        while work:
+            node, succ_iter = work[-1]
+            for succ_id in succ_iter:
+                if succ_id not in index:
+                    # Descend into the successor, resuming this node afterwards
+                    index[succ_id] = lowlink[succ_id] = len(index)
+                    stack.append(succ_id)
+                    on_stack.add(succ_id)
+                    work.append((succ_id, iter(successors.get(succ_id, ()))))
+                    break
+                if succ_id in on_stack:
+                    lowlink[node] = min(lowlink[node], index[succ_id])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1:
+                        cycles.append(component)
+    
+    return cycles
+
+
+class CyclicDependencyError(ValueError):
+    """Raised when task predecessors form a cycle and no schedule exists"""
+    
+    def __init__(self, cycles):
+        """
+        Args:
+            cycles (list): Lists of task IDs that depend on each other
+        """
+        self.cycles = cycles
+        self.ids = [task_id for cycle in cycles for task_id in cycle]
+        super().__init__("Cyclic dependency between tasks: " +
+                         "; ".join(", ".join(str(task_id) for task_id in cycle) for cycle in cycles))
+
 
 class GanttVisualizer:
     """
@@ -22,6 +208,21 @@ class GanttVisualizer:
         'en_retard': '#dc3545'     # Red for delayed tasks
     }
     
+    # Number of rendered charts kept by render_gantt_chart
+    RENDER_CACHE_SIZE = 32
+    _render_cache = OrderedDict()
+    _render_lock = threading.Lock()
+    
+    # Row of each status in the RGBA color table, built from STATUS_COLORS on first plot
+    _STATUS_INDEX = {status: i for i, status in enumerate(STATUS_COLORS)}
+    _status_rgba = None
+    
+    # Above this many tasks, per-bar duration labels are skipped
+    MAX_BAR_LABELS = 50
+    
+    # Projects this large are scheduled with the compiled kernel when numba is available
+    JIT_MIN_TASKS = 1000
+    
     def __init__(self, tasks=None):
         """
         Initialize visualizer with tasks
@@ -42,6 +243,13 @@ class GanttVisualizer:
         Returns:
             matplotlib.figure.Figure: Generated figure
         """
+        # Plotting libraries are only needed here, so JSON-only callers
+        # of get_gantt_data never pay for importing them
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        import matplotlib.dates as mdates
+        
         if not self.tasks:
             # Return empty figure if no tasks
             fig, ax = plt.subplots(figsize=figure_size)
@@ -60,28 +268,30 @@ class GanttVisualizer:
         # Create figure and axis
         fig, ax = plt.subplots(figsize=figure_size)
         
-        # Plot each task as a horizontal bar
-        labels = []
-        for i, task in enumerate(scheduled_tasks):
-            task_id = task.get('id')
-            task_name = task.get('nom', f'Task {task_id}')
-            labels.append(f"{task_id}: {task_name}")
-            
-            start = task['start_date']
-            duration = task.get('duree_estimee', 1)
-            end = start + timedelta(days=duration)
-            
-            status = task.get('statut', 'non_commencee')
-            color = self.STATUS_COLORS.get(status, self.STATUS_COLORS['non_commencee'])
-            
-            # Plot the task bar
-            ax.barh(i, (end - start).days, left=mdates.date2num(start), 
-                   color=color, edgecolor='black', alpha=0.8)
-            
-            # Add task duration as text
-            ax.text(mdates.date2num(start) + (end - start).days / 2, i,
-                   f"{duration}d", ha='center', va='center',
-                   color='white', fontweight='bold')
+        # Gather bar geometry and colors for all tasks
+        labels = [f"{task.get('id')}: {task.get('nom', 'Task ' + str(task.get('id')))}"
+                  for task in scheduled_tasks]
+        rows = np.arange(len(scheduled_tasks))
+        # Bar positions are day offsets from a single date2num of the project start
+        base = mdates.date2num(start_date)
+        starts = base + np.array([task['start_day'] for task in scheduled_tasks], dtype=float)
+        durations = [task.get('duree_estimee', 1) for task in scheduled_tasks]
+        widths = np.array(durations, dtype=float)
+        status_rgba = self._get_status_rgba()
+        default_index = self._STATUS_INDEX['non_commencee']
+        color_index = np.fromiter((self._STATUS_INDEX.get(task.get('statut'), default_index)
+                                   for task in scheduled_tasks),
+                                  dtype=np.int8, count=len(scheduled_tasks))
+        
+        # Plot all task bars in one call with an (N, 4) RGBA color array
+        ax.barh(rows, widths, left=starts, color=status_rgba[color_index],
+               edgecolor='black', alpha=0.8)
+        
+        # Add task duration as text
+        if len(scheduled_tasks) <= self.MAX_BAR_LABELS:
+            for row, center, duration in zip(rows, starts + widths / 2, durations):
+                ax.text(center, row, f"{duration}d", ha='center', va='center',
+                       color='white', fontweight='bold')
         
         # Configure x-axis as dates
         ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
@@ -100,7 +310,7 @@ class GanttVisualizer:
         
         # Create legend for task status
         status_patches = [plt.Rectangle((0, 0), 1, 1, color=color) 
-                         for color in self.STATUS_COLORS.values()]
+                         for color in status_rgba]
         status_labels = ['Completed', 'In Progress', 'Not Started', 'Delayed']
         ax.legend(status_patches, status_labels, loc='upper right')
         
@@ -109,6 +319,63 @@ class GanttVisualizer:
         
         return fig
     
+    def render_gantt_chart(self, start_date=None, figure_size=(12, 8), image_format='svg'):
+        """
+        Render the Gantt chart to image bytes, reusing earlier renders of the same schedule
+        
+        Args:
+            start_date (datetime): Project start date, defaults to today at midnight
+            figure_size (tuple): Figure dimensions (width, height)
+            image_format (str): Image format understood by matplotlib savefig
+            
+        Returns:
+            bytes: Rendered image
+        """
+        if not start_date:
+            start_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        
+        # Key on everything the chart depends on, so changed tasks miss the cache
+        chart_inputs = (
+            [(task.get('id'), task.get('nom'), task.get('duree_estimee', 1),
+              task.get('statut'), task.get('predecesseurs', []))
+             for task in self.tasks],
+            start_date.isoformat(), tuple(figure_size), image_format
+        )
+        key = hashlib.blake2b(repr(chart_inputs).encode('utf-8'), digest_size=16).digest()
+        
+        # The cache is shared by every instance, and so by concurrent requests;
+        # renders are serialized too since pyplot's figure state is global
+        cache = self._render_cache
+        with self._render_lock:
+            if key in cache:
+                cache.move_to_end(key)
+                return cache[key]
+            
+            import matplotlib.pyplot as plt
+            
+            fig = self.create_gantt_chart(start_date, figure_size)
+            buffer = BytesIO()
+            fig.savefig(buffer, format=image_format)
+            plt.close(fig)
+            
+            image = cache[key] = buffer.getvalue()
+            if len(cache) > self.RENDER_CACHE_SIZE:
+                cache.popitem(last=False)
+            return image
+    
+    @classmethod
+    def _get_status_rgba(cls):
+        """
+        Get STATUS_COLORS decoded to RGBA, one row per status
+        
+        Returns:
+            numpy.ndarray: Float array of shape (len(STATUS_COLORS), 4)
+        """
+        if cls._status_rgba is None:
+            import matplotlib.colors as mcolors
+            cls._status_rgba = mcolors.to_rgba_array(list(cls.STATUS_COLORS.values()))
+        return cls._status_rgba
+    
     def get_gantt_data(self, start_date=None):
         """
         Generate Gantt chart data for frontend visualization
@@ -147,7 +414,7 @@ class GanttVisualizer:
                 "name": task_name,
                 "start_date": start.strftime('%Y-%m-%d'),
                 "end_date": end.strftime('%Y-%m-%d'),
-                "start_day": (start - start_date).days,
+                "start_day": math.floor(task['start_day']),
                 "duration": duration,
                 "status": status,
                 "resources": task.get('ressources_requises', []),
@@ -164,7 +431,10 @@ class GanttVisualizer:
             start_date (datetime): Project start date
             
         Returns:
-            list: Tasks with calculated start dates
+            list: Tasks with calculated start dates and start day offsets
+            
+        Raises:
+            CyclicDependencyError: If task predecessors form a cycle
         """
         if not self.tasks:
             return []
@@ -174,72 +444,118 @@ class GanttVisualizer:
         for task in self.tasks:
             scheduled_tasks.append(task.copy())
         
-        # Task start dates dictionary (ID -> start date)
-        task_starts = {}
+        # Index tasks by ID (first occurrence wins) and cache their durations
+        by_id = {}
+        for task in scheduled_tasks:
+            by_id.setdefault(task.get('id'), task)
+        durations = {task_id: task.get('duree_estimee', 1) for task_id, task in by_id.items()}
         
-        # Topologically sort tasks based on dependencies
-        visited = set()
-        temp_mark = set()
-        sorted_tasks = []
+        # Successor lists and in-degrees over known tasks
+        successors = defaultdict(list)
+        in_degree = dict.fromkeys(by_id, 0)
+        for task_id, task in by_id.items():
+            for pred_id in task.get('predecesseurs', []):
+                if pred_id in by_id and pred_id != task_id:
+                    successors[pred_id].append(task_id)
+                    in_degree[task_id] += 1
         
-        def visit(task_id):
-            """Recursive topological sort visit function"""
-            if task_id in temp_mark:
-                # Cyclic dependency detected, break cycle
-                return
-            if task_id not in visited:
-                temp_mark.add(task_id)
-                
-                # Get task by id
-                task = None
-                for t in scheduled_tasks:
-                    if t.get('id') == task_id:
-                        task = t
-                        break
-                
-                if task:
-                    predecessors = task.get('predecesseurs', [])
-                    for pred_id in predecessors:
-                        visit(pred_id)
-                    
-                    visited.add(task_id)
-                    temp_mark.remove(task_id)
-                    sorted_tasks.append(task)
-        
-        # Start topological sort
-        for task in scheduled_tasks:
-            if task.get('id') not in visited:
-                visit(task.get('id'))
+        task_ids = list(by_id)
+        if len(task_ids) >= self.JIT_MIN_TASKS and _compile_kernels():
+            return self._schedule_compiled(task_ids, by_id, successors, in_degree,
+                                           durations, start_date)
         
-        # Calculate start dates based on dependencies
-        for task in sorted_tasks:
-            task_id = task.get('id')
-            predecessors = task.get('predecesseurs', [])
+        # Kahn's algorithm, releasing ready tasks in their original order
+        position = {task_id: i for i, task_id in enumerate(task_ids)}
+        ready = [position[task_id] for task_id in task_ids if in_degree[task_id] == 0]
+        heapq.heapify(ready)
+        
+        # Start offsets in days from start_date (ID -> day); dates are only
+        # built once per task when the schedule is emitted
+        task_starts = {}
+        earliest_starts = {}
+        sorted_tasks = []
+        
+        while ready:
+            task_id = task_ids[heapq.heappop(ready)]
             
-            if not predecessors:
-                # If no predecessors, start at project start date
-                task_starts[task_id] = start_date
-            else:
-                # Find the latest end date of all predecessors
-                latest_end = start_date
-                for pred_id in predecessors:
-                    if pred_id in task_starts:
-                        # Get predecessor task
-                        pred_task = None
-                        for t in scheduled_tasks:
-                            if t.get('id') == pred_id:
-                                pred_task = t
-                                break
-                        
-                        if pred_task:
-                            pred_duration = pred_task.get('duree_estimee', 1)
-                            pred_end = task_starts[pred_id] + timedelta(days=pred_duration)
-                            if pred_end > latest_end:
-                                latest_end = pred_end
-                
-                task_starts[task_id] = latest_end
+            # Start once the latest predecessor has finished
+            task_starts[task_id] = earliest_starts.get(task_id, 0)
+            task_end = task_starts[task_id] + durations[task_id]
+            
+            for succ_id in successors[task_id]:
+                if task_end > earliest_starts.get(succ_id, 0):
+                    earliest_starts[succ_id] = task_end
+                in_degree[succ_id] -= 1
+                if in_degree[succ_id] == 0:
+                    heapq.heappush(ready, position[succ_id])
             
             # Add start date to task
-            task['start_date'] = task_starts[task_id]
+            task = by_id[task_id]
+            task['start_day'] = task_starts[task_id]
+            task['start_date'] = start_date + timedelta(days=task['start_day'])
+            sorted_tasks.append(task)
+        
+        if len(sorted_tasks) < len(task_ids):
+            # Tasks that never became ready are on or behind a cycle
+            self._raise_cycle_error(task_ids, task_starts, successors)
         
         return sorted_tasks
+    
+    def _schedule_compiled(self, task_ids, by_id, successors, in_degree, durations, start_date):
+        """
+        Schedule tasks with the numba kernel over integer task indices
+        
+        Args:
+            task_ids (list): Task IDs in original order
+            by_id (dict): Task copies by ID
+            successors (dict): Successor IDs by task ID
+            in_degree (dict): Number of known predecessors by task ID
+            durations (dict): Durations in days by task ID
+            start_date (datetime): Project start date
+            
+        Returns:
+            list: Tasks with calculated start dates and start day offsets
+            
+        Raises:
+            CyclicDependencyError: If task predecessors form a cycle
+        """
+        n = len(task_ids)
+        position = {task_id: i for i, task_id in enumerate(task_ids)}
+        
+        # Successors in CSR form: those of task i are succ[indptr[i]:indptr[i + 1]]
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(successors[task_id]) for task_id in task_ids])
+        succ = np.fromiter((position[succ_id] for task_id in task_ids for succ_id in successors[task_id]),
+                           dtype=np.int64, count=int(indptr[-1]))
+        degrees = np.fromiter((in_degree[task_id] for task_id in task_ids), dtype=np.int64, count=n)
+        days = np.fromiter((durations[task_id] for task_id in task_ids), dtype=np.float64, count=n)
+        
+        order, start_days, count = _schedule_kernel(indptr, succ, degrees, days)
+        if count < n:
+            scheduled = {task_ids[i] for i in order[:count].tolist()}
+            self._raise_cycle_error(task_ids, scheduled, successors)
+        
+        sorted_tasks = []
+        for i, start_day in zip(order.tolist(), start_days[order].tolist()):
+            task = by_id[task_ids[i]]
+            task['start_day'] = start_day
+            task['start_date'] = start_date + timedelta(days=start_day)
+            sorted_tasks.append(task)
+        
+        return sorted_tasks
+    
+    def _raise_cycle_error(self, task_ids, scheduled, successors):
+        """
+        Raise CyclicDependencyError for the cycles among unscheduled tasks
+        
+        Args:
+            task_ids (list): Task IDs in original order
+            scheduled (collection): IDs of the tasks that could be scheduled
+            successors (dict): Successor IDs by task ID
+        """
+        position = {task_id: i for i, task_id in enumerate(task_ids)}
+        blocked = [task_id for task_id in task_ids if task_id not in scheduled]
+        cycles = [sorted(cycle, key=position.get)
+                  for cycle in _find_dependency_cycles(blocked, successors)]
+        cycles.sort(key=lambda cycle: position[cycle[0]])
+        raise CyclicDependencyError(cycles)
@@ -2,8 +2,56 @@
 JSON Parser Module
 Parses project JSON files and extracts relevant information
 """
+from collections import Counter
 from datetime import datetime, timedelta
 import json
+import os
+
+try:
+    import ijson
+except ImportError:  # optional, only used to stream project files from disk
+    ijson = None
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # optional, faster decoding of whole project files
+    _loads = json.loads
+
+# Top-level keys that may hold the task list
+_TASKS_KEYS = ('taches', 'tasks', 'activites')
+
+# Top-level project metadata keys, in priority order
+_PROJECT_NAME_KEYS = ('nom_projet', 'project_name', 'nom', 'name', 'titre', 'title')
+_PROJECT_MANAGER_KEYS = ('responsable', 'manager', 'chef_projet', 'project_manager')
+_START_DATE_KEYS = ('date_debut', 'start_date', 'debut', 'start')
+_END_DATE_KEYS = ('date_fin', 'end_date', 'fin', 'end', 'date_fin_prevue')
+
+# Accepted source keys for each normalized task field, in priority order
+_TASK_FIELD_KEYS = (
+    ('nom', ('nom', 'name', 'titre', 'title')),
+    ('description', ('description', 'desc', 'detail', 'details')),
+    ('duree_estimee', ('duree_estimee', 'duree', 'duration', 'estimated_duration')),
+    ('unite_duree', ('unite_duree', 'duration_unit', 'unite')),
+    ('predecesseurs', ('predecesseurs', 'predecessors', 'dependances', 'dependencies')),
+    ('ressources_requises', ('ressources_requises', 'resources', 'ressources')),
+    ('statut', ('statut', 'status', 'etat')),
+)
+
+# Standardized status values, already in normalized form
+_CANONICAL_STATUSES = frozenset({'terminee', 'en_cours', 'non_commencee', 'en_retard'})
+
+# Lowercased status terms mapped to standardized values
+_STATUS_MAP = {
+    term: status
+    for status, terms in {
+        'terminee': ('terminé', 'terminee', 'done', 'complete', 'completed', 'finished'),
+        'en_cours': ('en cours', 'en_cours', 'in progress', 'ongoing', 'in_progress'),
+        'non_commencee': ('non commencé', 'non_commencee', 'not started', 'todo', 'to_do', 'to do', 'planned'),
+        'en_retard': ('en retard', 'en_retard', 'late', 'delayed', 'overdue'),
+    }.items()
+    for term in terms
+}
 
 
 class ProjectParser:
@@ -12,6 +60,10 @@ class ProjectParser:
     Handles various JSON structures and provides task data extraction
     """
     
+    # Project files this large are streamed with ijson when it is available;
+    # smaller files are decoded whole, which is faster
+    STREAM_MIN_BYTES = 64 * 1024 * 1024
+    
     def __init__(self, json_data=None, file_path=None):
         """
         Initialize parser with either JSON data or file path
@@ -21,13 +73,21 @@ class ProjectParser:
             file_path (str): Path to JSON file
         """
         self.data = None
+        self._tasks_file = None
+        self._tasks_cache = None
+        self._status_counts_cache = None
         
         if json_data:
             self.data = json_data
         elif file_path:
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    self.data = json.load(f)
+                if ijson is not None and os.path.getsize(file_path) >= self.STREAM_MIN_BYTES:
+                    # Tasks are streamed from the file later by get_tasks
+                    self.data = self._read_file_metadata(file_path)
+                    self._tasks_file = file_path
+                else:
+                    with open(file_path, 'rb') as f:
+                        self.data = _loads(f.read())
             except Exception as e:
                 raise ValueError(f"Could not parse JSON file: {str(e)}")
                 
@@ -46,6 +106,9 @@ class ProjectParser:
             raise ValueError("No data provided")
             
         self.data = json_data
+        self._tasks_file = None
+        self._tasks_cache = None
+        self._status_counts_cache = None
         return True
 
     def get_tasks(self):
@@ -57,20 +120,43 @@ class ProjectParser:
         """
         if not self.data:
             return []
+        
+        if self._tasks_cache is not None:
+            return self._tasks_cache
             
         # Handle different JSON structures
-        tasks_key = None
-        for key in ['taches', 'tasks', 'activites']:
-            if key in self.data:
-                tasks_key = key
-                break
+        tasks_key = self._get_first_match(self.data, _TASKS_KEYS)
         
         if not tasks_key:
             return []
             
-        raw_tasks = self.data[tasks_key]
+        if self._tasks_file is not None:
+            # Normalize tasks one at a time as they are parsed from disk
+            with open(self._tasks_file, 'rb') as f:
+                normalized_tasks = self._normalize_tasks(
+                    ijson.items(f, f'{tasks_key}.item', use_float=True))
+        else:
+            normalized_tasks = self._normalize_tasks(self.data[tasks_key])
+        
+        self._tasks_cache = normalized_tasks
+        return normalized_tasks
+    
+    def _normalize_tasks(self, raw_tasks):
+        """
+        Normalize raw task objects
+        
+        Args:
+            raw_tasks (iterable): Task objects as found in the project data
+            
+        Returns:
+            list: List of normalized task objects
+        """
         normalized_tasks = []
         
+        # Tasks in one project almost always share a schema, so resolve
+        # the source key of each field once per distinct set of keys
+        keys_by_shape = {}
+        
         for task in raw_tasks:
             # Map task properties with different possible naming conventions
             task_id = task.get('id', task.get('identifiant', task.get('task_id', None)))
@@ -79,31 +165,31 @@ class ProjectParser:
             if task_id is None:
                 continue
                 
-            name_key = self._get_first_match(task, ['nom', 'name', 'titre', 'title'])
-            desc_key = self._get_first_match(task, ['description', 'desc', 'detail', 'details'])
-            duration_key = self._get_first_match(task, ['duree_estimee', 'duree', 'duration', 'estimated_duration'])
-            duration_unit_key = self._get_first_match(task, ['unite_duree', 'duration_unit', 'unite'])
-            pred_key = self._get_first_match(task, ['predecesseurs', 'predecessors', 'dependances', 'dependencies'])
-            resources_key = self._get_first_match(task, ['ressources_requises', 'resources', 'ressources'])
-            status_key = self._get_first_match(task, ['statut', 'status', 'etat'])
+            shape = frozenset(task)
+            keys = keys_by_shape.get(shape)
+            if keys is None:
+                keys = {field: self._get_first_match(task, candidates)
+                        for field, candidates in _TASK_FIELD_KEYS}
+                keys_by_shape[shape] = keys
             
             # Handle different status values
+            status_key = keys['statut']
             status = task.get(status_key, 'non_commencee') if status_key else 'non_commencee'
             normalized_status = self._normalize_status(status)
             
             normalized_task = {
                 'id': task_id,
-                'nom': task.get(name_key, f"Task {task_id}"),
-                'description': task.get(desc_key, ''),
-                'duree_estimee': task.get(duration_key, 1),
-                'unite_duree': task.get(duration_unit_key, 'jours'),
-                'predecesseurs': task.get(pred_key, []),
-                'ressources_requises': task.get(resources_key, []),
+                'nom': task.get(keys['nom'], f"Task {task_id}"),
+                'description': task.get(keys['description'], ''),
+                'duree_estimee': task.get(keys['duree_estimee'], 1),
+                'unite_duree': task.get(keys['unite_duree'], 'jours'),
+                'predecesseurs': task.get(keys['predecesseurs'], []),
+                'ressources_requises': task.get(keys['ressources_requises'], []),
                 'statut': normalized_status
             }
             
             normalized_tasks.append(normalized_task)
-            
+        
         return normalized_tasks
     
     def get_summary(self):
@@ -123,21 +209,9 @@ class ProjectParser:
         # Get normalized tasks
         tasks = self.get_tasks()
         
-        # Calculate total duration (simplistic - doesn't account for parallel tasks)
-        total_duration = sum(task.get('duree_estimee', 0) for task in tasks)
-        duration_unit = 'jours'  # Default
-        
-        # Try to determine most common duration unit
-        if tasks:
-            unit_counts = {}
-            for task in tasks:
-                unit = task.get('unite_duree', 'jours')
-                unit_counts[unit] = unit_counts.get(unit, 0) + 1
-            
-            if unit_counts:
-                duration_unit = max(unit_counts.items(), key=lambda x: x[1])[0]
-        
-        # Count task statuses
+        # Aggregate duration, duration units and statuses in a single pass
+        total_duration = 0  # simplistic - doesn't account for parallel tasks
+        unit_counts = {}
         status_counts = {
             'non_commencee': 0,
             'en_cours': 0,
@@ -146,9 +220,21 @@ class ProjectParser:
         }
         
         for task in tasks:
+            total_duration += task.get('duree_estimee', 0)
+            unit = task.get('unite_duree', 'jours')
+            unit_counts[unit] = unit_counts.get(unit, 0) + 1
             status = task.get('statut', 'non_commencee')
             if status in status_counts:
                 status_counts[status] += 1
+        
+        # Most common duration unit, 'jours' by default
+        duration_unit = 'jours'
+        if unit_counts:
+            duration_unit = max(unit_counts.items(), key=lambda x: x[1])[0]
+        
+        # Later status count requests reuse this pass
+        if self._status_counts_cache is None:
+            self._status_counts_cache = dict(status_counts)
                 
         # Calculate completion percentage
         completed = status_counts.get('terminee', 0)
@@ -189,42 +275,57 @@ class ProjectParser:
     
     def _get_project_name(self):
         """Extract project name from data"""
-        name_keys = ['nom_projet', 'project_name', 'nom', 'name', 'titre', 'title']
-        for key in name_keys:
-            if key in self.data:
-                return self.data[key]
-        return "Untitled Project"
+        data = self.data
+        return next((data[key] for key in _PROJECT_NAME_KEYS if key in data), "Untitled Project")
     
     def _get_project_manager(self):
         """Extract project manager from data"""
-        manager_keys = ['responsable', 'manager', 'chef_projet', 'project_manager']
-        for key in manager_keys:
-            if key in self.data:
-                return self.data[key]
-        return None
+        data = self.data
+        return next((data[key] for key in _PROJECT_MANAGER_KEYS if key in data), None)
+    
+    def _read_file_metadata(self, file_path):
+        """
+        Read the top-level fields of a project file without building its tasks
+        
+        Args:
+            file_path (str): Path to JSON file
+            
+        Returns:
+            dict: Top-level fields, with an empty placeholder for the tasks key
+        """
+        data = {}
+        key = builder = None
+        with open(file_path, 'rb') as f:
+            for prefix, event, value in ijson.parse(f, use_float=True):
+                if builder is not None:
+                    # Inside a nested top-level value, until its closing event
+                    builder.event(event, value)
+                    if prefix == key and event in ('end_map', 'end_array'):
+                        data[key] = builder.value
+                        builder = None
+                elif not prefix or '.' in prefix:
+                    continue
+                elif event == 'start_array' and prefix in _TASKS_KEYS:
+                    data[prefix] = []
+                elif event in ('start_map', 'start_array'):
+                    key, builder = prefix, ijson.ObjectBuilder()
+                    builder.event(event, value)
+                elif event in ('string', 'number', 'boolean', 'null'):
+                    data[prefix] = value
+        return data
     
     def _get_first_match(self, obj, possible_keys):
         """Return first key that exists in object"""
-        for key in possible_keys:
-            if key in obj:
-                return key
-        return None
+        return next((key for key in possible_keys if key in obj), None)
         
     def _normalize_status(self, status):
         """Normalize task status to standard values"""
-        status_lower = str(status).lower()
-        
-        # Map various status terms to standardized values
-        if status_lower in ['terminé', 'terminee', 'done', 'complete', 'completed', 'finished']:
-            return 'terminee'
-        elif status_lower in ['en cours', 'en_cours', 'in progress', 'ongoing', 'in_progress']:
-            return 'en_cours'
-        elif status_lower in ['non commencé', 'non_commencee', 'not started', 'todo', 'to_do', 'to do', 'planned']:
-            return 'non_commencee'
-        elif status_lower in ['en retard', 'en_retard', 'late', 'delayed', 'overdue']:
-            return 'en_retard'
-        else:
-            return 'non_commencee'  # Default to not started
+        # Most project files already use the standard values
+        if isinstance(status, str) and status in _CANONICAL_STATUSES:
+            return status
+        
+        # Unknown statuses default to not started
+        return _STATUS_MAP.get(str(status).lower(), 'non_commencee')
     
     def get_dashboard_data(self):
         """
@@ -262,7 +363,9 @@ class ProjectParser:
     
     def get_task_status_counts(self):
         """Get counts of tasks by status"""
-        tasks = self.get_tasks()
+        if self._status_counts_cache is not None:
+            return self._status_counts_cache
+        
         status_counts = {
             'non_commencee': 0,
             'en_cours': 0,
@@ -270,11 +373,12 @@ class ProjectParser:
             'en_retard': 0
         }
         
-        for task in tasks:
+        for task in self.get_tasks():
             status = task.get('statut', 'non_commencee')
             if status in status_counts:
                 status_counts[status] += 1
         
+        self._status_counts_cache = status_counts
         return status_counts
     
     def get_completion_percentage(self):
@@ -288,30 +392,24 @@ class ProjectParser:
     def get_resource_allocation(self):
         """Get resource allocation across tasks"""
         tasks = self.get_tasks()
-        resource_allocation = {}
+        resource_allocation = Counter()
         
         for task in tasks:
             resources = task.get('ressources_requises', [])
-            for resource in resources:
-                if isinstance(resource, str):
-                    resource_name = resource
-                else:
-                    resource_name = resource.get('name', str(resource))
-                    
-                if resource_name not in resource_allocation:
-                    resource_allocation[resource_name] = 1
-                else:
-                    resource_allocation[resource_name] += 1
+            resource_allocation.update(
+                resource if isinstance(resource, str) else resource.get('name', str(resource))
+                for resource in resources
+            )
         
-        return resource_allocation
+        return dict(resource_allocation)
     
     def _extract_start_date(self):
         """Extract or estimate project start date"""
         # Try to find project start date in data
-        date_keys = ['date_debut', 'start_date', 'debut', 'start']
-        for key in date_keys:
-            if key in self.data and self.data[key]:
-                return self.data[key]
+        data = self.data
+        start_date = next((data[key] for key in _START_DATE_KEYS if key in data and data[key]), None)
+        if start_date:
+            return start_date
         
         # Default to current date if not found
         return datetime.now().strftime('%Y-%m-%d')
@@ -319,10 +417,10 @@ class ProjectParser:
     def _extract_end_date(self):
         """Extract or estimate project end date"""
         # Try to find project end date in data
-        date_keys = ['date_fin', 'end_date', 'fin', 'end', 'date_fin_prevue']
-        for key in date_keys:
-            if key in self.data and self.data[key]:
-                return self.data[key]
+        data = self.data
+        end_date = next((data[key] for key in _END_DATE_KEYS if key in data and data[key]), None)
+        if end_date:
+            return end_date
         
         # Default to 30 days from now if not found using timedelta
         return (datetime.now() + timedelta(days=30)).strftime('%Y-%m-%d')
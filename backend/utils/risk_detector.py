@@ -2,7 +2,31 @@
 Risk Detection Module
 Analyzes project data to identify potential risks and issues
 """
-from collections import defaultdict
+from bisect import bisect_left
+from collections import Counter, defaultdict, deque
+from functools import cached_property
+from itertools import chain
+import sys
+
+import numpy as np
+
+# Risk levels, interned so that every risk shares the same string objects
+_LVL_HIGH = sys.intern("Élevé")
+_LVL_MED = sys.intern("Moyen")
+_LVL_LOW = sys.intern("Faible")
+_LVL_VLOW = sys.intern("Très faible")
+
+# Risk level of a task-level risk, indexed by whether the task is on the critical path
+_LEVELS = (_LVL_MED, _LVL_HIGH)
+
+# Overall risk level by total number of risks: 0, up to 2, up to 5, more
+_LEVEL_CUTS = (0, 2, 5)
+_LEVEL_NAMES = (_LVL_VLOW, _LVL_LOW, _LVL_MED, _LVL_HIGH)
+
+# Projected share of the total risk at each project stage: risks increase
+# until 50% then decrease (the peak weight stays an int so the count does too)
+_TIME_POINTS = ("Project Start", "25%", "50%", "75%", "Project End")
+_TIMELINE_WEIGHTS = (0.5, 0.8, 1, 0.7, 0.3)
 
 
 class RiskDetector:
@@ -21,7 +45,156 @@ class RiskDetector:
         """
         self.tasks = tasks or []
         self.critical_path = critical_path or []
-        self.critical_path_ids = set(self.critical_path)
+        self.critical_path_ids = frozenset(self.critical_path)
+        self._risks_cache = None
+        self._task_level_risks = None
+        
+        # Task fields read by the detectors, one list per field in task order
+        self._ids = [task.get('id') for task in self.tasks]
+        self._durations = [task.get('duree_estimee', 0) for task in self.tasks]
+        self._preds = [task.get('predecesseurs', []) for task in self.tasks]
+        self._resources = [task.get('ressources_requises', []) for task in self.tasks]
+        self._has_no_resources = [not any(resources or ()) for resources in self._resources]
+        self._is_critical = [task_id in self.critical_path_ids for task_id in self._ids]
+        
+        # Array views of the same fields for vectorized scans
+        task_count = len(self.tasks)
+        self._durations_np = np.fromiter(self._durations, dtype=np.float64, count=task_count)
+        self._critical_mask = np.fromiter(self._is_critical, dtype=bool, count=task_count)
+        self._no_res_mask = np.fromiter(self._has_no_resources, dtype=bool, count=task_count)
+        self._pred_counts = np.fromiter((len(preds) for preds in self._preds),
+                                        dtype=np.int64, count=task_count)
+        self._resource_counts = np.fromiter((len(resources) for resources in self._resources),
+                                            dtype=np.int64, count=task_count)
+    
+    def _get_risks(self):
+        """
+        Run every risk detector once and cache the results
+        
+        Returns:
+            dict: Detected risks by type
+        """
+        if self._risks_cache is None:
+            self._risks_cache = {
+                "no_resources": self._tasks_without_resources(),
+                "no_dependencies": self._tasks_without_dependencies(),
+                "bottlenecks": self._detect_bottlenecks(),
+                "overloaded_resources": self._detect_overloaded_resources(),
+                "timeline_risks": self._detect_timeline_risks(),
+                "dependency_conflicts": self._detect_dependency_conflicts(),
+                "resource_conflicts": self._detect_resource_allocation_conflicts()
+            }
+        return self._risks_cache
+    
+    @cached_property
+    def _dependency_map(self):
+        """Map of task IDs to their predecessors"""
+        return {task_id: preds for task_id, preds in zip(self._ids, self._preds)}
+    
+    @cached_property
+    def _all_task_ids(self):
+        """Set of all task IDs"""
+        return set(self._ids)
+    
+    @cached_property
+    def _initial_task_ids(self):
+        """IDs of tasks without predecessors"""
+        return {task_id for task_id, preds in zip(self._ids, self._preds) if not preds}
+    
+    @cached_property
+    def _referenced_as_dependency(self):
+        """IDs of known tasks that other tasks depend on"""
+        all_task_ids = self._all_task_ids
+        return {dep for preds in self._preds for dep in preds if dep in all_task_ids}
+    
+    @cached_property
+    def _avg_duration(self):
+        """Average task duration (0 without tasks)"""
+        return sum(self._durations) / len(self.tasks) if self.tasks else 0
+    
+    @cached_property
+    def _task_scan(self):
+        """
+        Per-task risk conditions, computed with vectorized masks over the task arrays
+        
+        Returns:
+            tuple: (bottleneck mask, timeline risk mask, risk count per task)
+        """
+        # Bottleneck threshold (tasks taking significantly longer than average)
+        threshold = self._avg_duration * 1.5
+        durations = self._durations_np
+        bottleneck = durations > threshold
+        timeline = ((durations != 0) & (durations < 3) &
+                    ((self._pred_counts > 2) | (self._resource_counts > 2)))
+        risk_counts = self._no_res_mask.astype(np.int64) + (self._critical_mask & (durations > 10))
+        return bottleneck, timeline, risk_counts
+    
+    @cached_property
+    def _resource_index(self):
+        """
+        Tasks requiring each (non-empty) resource
+        
+        Returns:
+            tuple: (tasks by resource, number of those tasks on the critical path by resource)
+        """
+        resource_tasks = defaultdict(list)
+        critical_counts = defaultdict(int)
+        for task, resources, is_critical in zip(self.tasks, self._resources, self._is_critical):
+            for resource in resources:
+                if resource:  # Skip empty resource names
+                    resource_tasks[resource].append(task)
+                    critical_counts[resource] += is_critical
+        return dict(resource_tasks), dict(critical_counts)
+    
+    @cached_property
+    def _topo(self):
+        """
+        Topological order of the dependency graph, with the longest dependency
+        chain ending at each task
+        
+        Tasks on or behind a dependency cycle are left out of the order; their
+        chains only count predecessors that are in it.
+        
+        Returns:
+            tuple: (ordered task IDs, chain length by task ID,
+                previous task in the chain by task ID)
+        """
+        dependency_map = self._dependency_map
+        
+        # Kahn's algorithm over known predecessors, ignoring self-dependencies
+        successors = defaultdict(list)
+        in_degree = dict.fromkeys(dependency_map, 0)
+        for task_id, preds in dependency_map.items():
+            for pred in preds:
+                if pred in dependency_map and pred != task_id:
+                    successors[pred].append(task_id)
+                    in_degree[task_id] += 1
+        
+        ready = deque(task_id for task_id, degree in in_degree.items() if degree == 0)
+        order = []
+        while ready:
+            task_id = ready.popleft()
+            order.append(task_id)
+            for succ in successors[task_id]:
+                in_degree[succ] -= 1
+                if in_degree[succ] == 0:
+                    ready.append(succ)
+        
+        # Residual in-degree means a cycle blocked these tasks
+        blocked = [task_id for task_id, degree in in_degree.items() if degree > 0]
+        
+        # Pull chain lengths from predecessors, which precede each task in the order
+        chain_lengths = {}
+        chain_parents = {}
+        for task_id in chain(order, blocked):
+            length, parent = 1, None
+            for pred in dependency_map[task_id]:
+                if pred in chain_lengths and chain_lengths[pred] >= length:
+                    length, parent = chain_lengths[pred] + 1, pred
+            chain_lengths[task_id] = length
+            chain_parents[task_id] = parent
+        
+        return order, chain_lengths, chain_parents
     
     def detect_risks(self):
         """
@@ -31,13 +204,14 @@ class RiskDetector:
             dict: Risk analysis results
         """
         # Collect all risk types
-        no_resources = self._tasks_without_resources()
-        no_dependencies = self._tasks_without_dependencies()
-        bottlenecks = self._detect_bottlenecks()
-        overloaded_resources = self._detect_overloaded_resources()
-        timeline_risks = self._detect_timeline_risks()
-        dependency_conflicts = self._detect_dependency_conflicts()
-        resource_conflicts = self._detect_resource_allocation_conflicts()
+        risks = self._get_risks()
+        no_resources = risks["no_resources"]
+        no_dependencies = risks["no_dependencies"]
+        bottlenecks = risks["bottlenecks"]
+        overloaded_resources = risks["overloaded_resources"]
+        timeline_risks = risks["timeline_risks"]
+        dependency_conflicts = risks["dependency_conflicts"]
+        resource_conflicts = risks["resource_conflicts"]
         
         # Calculate risk scores by category
         risk_scores = {
@@ -79,15 +253,7 @@ class RiskDetector:
             "risk_level": risk_level,
             "risk_scores": risk_scores,
             "risk_metrics": risk_metrics,
-            "risks": {
-                "no_resources": no_resources,
-                "no_dependencies": no_dependencies,
-                "bottlenecks": bottlenecks,
-                "overloaded_resources": overloaded_resources,
-                "timeline_risks": timeline_risks,
-                "dependency_conflicts": dependency_conflicts,
-                "resource_conflicts": resource_conflicts
-            },
+            "risks": dict(risks),
             "recommendations": recommendations,
             "chart_data": chart_data,
             "risk_distribution": risk_distribution,
@@ -103,18 +269,14 @@ class RiskDetector:
         """
         result = []
         
-        for task in self.tasks:
-            resources = task.get('ressources_requises', [])
-            
+        for i, task in enumerate(self.tasks):
             # Check if resources is empty or contains only empty strings
-            if not resources or all(not r for r in resources):
+            if self._has_no_resources[i]:
                 # Determine risk level - higher for critical path tasks
-                risk_level = "Élevé" if task.get('id') in self.critical_path_ids else "Moyen"
+                risk_level = _LEVELS[self._is_critical[i]]
                 
                 # Add task to result with risk level
-                task_copy = task.copy()
-                task_copy['risk_level'] = risk_level
-                result.append(task_copy)
+                result.append({**task, 'risk_level': risk_level})
         
         return result
     
@@ -128,32 +290,18 @@ class RiskDetector:
         result = []
         
         # Skip the first task(s) as they naturally have no predecessors
-        initial_task_ids = set()
-        for task in self.tasks:
-            has_predecessors = bool(task.get('predecesseurs', []))
-            if not has_predecessors:
-                initial_task_ids.add(task.get('id'))
-        
-        # Find all task IDs for reference
-        all_task_ids = {task.get('id') for task in self.tasks}
+        initial_task_ids = self._initial_task_ids
         
         # Track tasks that are referenced as dependencies
-        referenced_as_dependency = set()
-        for task in self.tasks:
-            for dep in task.get('predecesseurs', []):
-                if dep in all_task_ids:
-                    referenced_as_dependency.add(dep)
+        referenced_as_dependency = self._referenced_as_dependency
         
         # Find tasks that are neither initial nor referenced as dependencies
-        for task in self.tasks:
-            task_id = task.get('id')
+        for task, task_id in zip(self.tasks, self._ids):
             if task_id not in initial_task_ids and task_id not in referenced_as_dependency:
                 # Tasks not referenced as dependencies might be forgotten or isolated
-                risk_level = "Faible"  # Generally lower risk, but worth checking
+                risk_level = _LVL_LOW  # Generally lower risk, but worth checking
                 
-                task_copy = task.copy()
-                task_copy['risk_level'] = risk_level
-                result.append(task_copy)
+                result.append({**task, 'risk_level': risk_level})
         
         return result
     
@@ -170,26 +318,24 @@ class RiskDetector:
         if not self.tasks:
             return result
             
-        total_duration = sum(task.get('duree_estimee', 0) for task in self.tasks)
-        avg_duration = total_duration / len(self.tasks)
+        avg_duration = self._avg_duration
         
-        # Bottleneck threshold (tasks taking significantly longer than average)
-        threshold = avg_duration * 1.5
+        # Task is a bottleneck if it's significantly longer than average
+        # and especially if it's on the critical path
+        rows = np.flatnonzero(self._task_scan[0])
         
-        for task in self.tasks:
-            duration = task.get('duree_estimee', 0)
-            task_id = task.get('id')
+        # Duration ratios for the selected rows in one vectorized division
+        ratios = (self._durations_np[rows] / avg_duration).tolist()
+        
+        for i, ratio in zip(rows.tolist(), ratios):
+            risk_level = _LEVELS[self._is_critical[i]]
             
-            # Task is a bottleneck if it's significantly longer than average
-            # and especially if it's on the critical path
-            if duration > threshold:
-                risk_level = "Élevé" if task_id in self.critical_path_ids else "Moyen"
-                
-                task_copy = task.copy()
-                task_copy['risk_level'] = risk_level
-                task_copy['average_duration'] = avg_duration
-                task_copy['duration_ratio'] = duration / avg_duration
-                result.append(task_copy)
+            result.append({
+                **self.tasks[i],
+                'risk_level': risk_level,
+                'average_duration': avg_duration,
+                'duration_ratio': ratio
+            })
         
         return result
     
@@ -203,14 +349,7 @@ class RiskDetector:
         result = []
         
         # Resource to tasks mapping
-        resource_tasks = defaultdict(list)
-        
-        for task in self.tasks:
-            resources = task.get('ressources_requises', [])
-            
-            for resource in resources:
-                if resource:  # Skip empty resource strings
-                    resource_tasks[resource].append(task)
+        resource_tasks, critical_counts = self._resource_index
         
         # Consider resources with more than 3 tasks as potentially overloaded
         threshold = 3
@@ -218,16 +357,14 @@ class RiskDetector:
         for resource, tasks in resource_tasks.items():
             if len(tasks) > threshold:
                 # Higher risk for resources on critical path tasks
-                critical_tasks = [task for task in tasks 
-                                if task.get('id') in self.critical_path_ids]
-                
-                risk_level = "Élevé" if critical_tasks else "Moyen"
+                critical_count = critical_counts[resource]
+                risk_level = _LVL_HIGH if critical_count else _LVL_MED
                 
                 result.append({
                     "resource": resource,
                     "task_count": len(tasks),
                     "tasks": tasks,
-                    "critical_tasks": len(critical_tasks),
+                    "critical_tasks": critical_count,
                     "risk_level": risk_level
                 })
         
@@ -243,14 +380,7 @@ class RiskDetector:
         Returns:
             str: Overall risk level
         """
-        if total_risks == 0:
-            return "Très faible"
-        elif total_risks <= 2:
-            return "Faible"
-        elif total_risks <= 5:
-            return "Moyen"
-        else:
-            return "Élevé"
+        return _LEVEL_NAMES[bisect_left(_LEVEL_CUTS, total_risks)]
     
     def _detect_timeline_risks(self):
         """
@@ -262,24 +392,17 @@ class RiskDetector:
         """
         timeline_risks = []
         
-        # Look for tasks with very short durations that might be unrealistic
-        for task in self.tasks:
-            # Skip tasks with zero or no duration
-            if not task.get('duree_estimee'):
-                continue
-                
-            task_id = task.get('id')
-            duration = task.get('duree_estimee', 0)
-            num_predecessors = len(task.get('predecesseurs', []))
-            num_resources = len(task.get('ressources_requises', []))
-            
-            # Complex tasks (many dependencies or resources) with short durations
-            if (num_predecessors > 2 or num_resources > 2) and duration < 3:
-                risk_level = "Élevé" if task_id in self.critical_path_ids else "Moyen"
-                task_copy = task.copy()
-                task_copy['risk_level'] = risk_level
-                task_copy['risk_reason'] = "Durée potentiellement sous-estimée pour une tâche complexe"
-                timeline_risks.append(task_copy)
+        # Look for tasks with very short (but non-zero) durations that might be unrealistic:
+        # complex tasks (many dependencies or resources) with short durations
+        rows = np.flatnonzero(self._task_scan[1])
+        
+        for i in rows.tolist():
+            risk_level = _LEVELS[self._is_critical[i]]
+            timeline_risks.append({
+                **self.tasks[i],
+                'risk_level': risk_level,
+                'risk_reason': "Durée potentiellement sous-estimée pour une tâche complexe"
+            })
         
         return timeline_risks
     
@@ -292,61 +415,40 @@ class RiskDetector:
         """
         conflicts = []
         
-        # Build a dependency map
-        dependency_map = {}
-        for task in self.tasks:
-            task_id = task.get('id')
-            predecessors = task.get('predecesseurs', [])
-            dependency_map[task_id] = predecessors
+        # Longest dependency chain ending at each task, from the cached topological pass
+        _, chain_lengths, chain_parents = self._topo
         
-        # Check for circular dependencies and long dependency chains
-        for task in self.tasks:
-            task_id = task.get('id')
-            
-            # Check for long dependency chains (5+ dependencies)
-            chain = self._get_dependency_chain(task_id, dependency_map)
-            if len(chain) > 5:
-                risk_level = "Élevé" if task_id in self.critical_path_ids else "Moyen"
+        # Check for long dependency chains (5+ dependencies)
+        for task, task_id, is_critical in zip(self.tasks, self._ids, self._is_critical):
+            if chain_lengths[task_id] > 5:
+                risk_level = _LEVELS[is_critical]
                 conflicts.append({
                     'task_id': task_id,
                     'task_name': task.get('nom', ''),
                     'risk_level': risk_level,
-                    'dependency_chain': chain,
+                    'dependency_chain': self._get_dependency_chain(task_id, chain_parents),
                     'risk_type': 'long_dependency_chain'
                 })
                 
         return conflicts
     
-    def _get_dependency_chain(self, task_id, dependency_map, visited=None):
+    def _get_dependency_chain(self, task_id, chain_parents):
         """
-        Get the full dependency chain for a task
+        Get the longest dependency chain for a task
         
         Args:
             task_id: The ID of the task to check
-            dependency_map: Map of task IDs to their predecessors
-            visited: Set of already visited task IDs (for cycle detection)
+            chain_parents: Previous task in the longest chain by task ID
             
         Returns:
-            list: Chain of dependencies
-        """
-        if visited is None:
-            visited = set()
-            
-        if task_id in visited:
-            # Circular dependency detected
-            return [task_id]
-            
-        visited.add(task_id)
-        chain = [task_id]
-        
-        # Get predecessors
-        predecessors = dependency_map.get(task_id, [])
-        for pred in predecessors:
-            if pred in dependency_map:
-                pred_chain = self._get_dependency_chain(pred, dependency_map, visited.copy())
-                chain = pred_chain + chain
-                
-        return chain
+            list: Chain of dependencies, ending with the task itself
+        """
+        dependency_chain = []
+        while task_id is not None:
+            dependency_chain.append(task_id)
+            task_id = chain_parents[task_id]
+        dependency_chain.reverse()
+        return dependency_chain
     
     def _detect_resource_allocation_conflicts(self):
         """
@@ -358,12 +460,7 @@ class RiskDetector:
         conflicts = []
         
         # Group tasks by resource
-        resource_tasks = defaultdict(list)
-        for task in self.tasks:
-            resources = task.get('ressources_requises', [])
-            for resource in resources:
-                if resource:  # Skip empty resource names
-                    resource_tasks[resource].append(task)
+        resource_tasks, critical_counts = self._resource_index
         
         # Check for conflicts (same resource assigned to parallel tasks)
         for resource, tasks in resource_tasks.items():
@@ -375,14 +472,17 @@ class RiskDetector:
             
             for group in parallel_task_groups:
                 if len(group) > 1:
-                    # We have a potential conflict
-                    critical_tasks = [t for t in group if t.get('id') in self.critical_path_ids]
-                    risk_level = "Élevé" if critical_tasks else "Moyen"
+                    # We have a potential conflict; groups of a resource without
+                    # critical path tasks cannot contain any
+                    critical_count = 0
+                    if critical_counts[resource]:
+                        critical_count = sum(1 for t in group if t.get('id') in self.critical_path_ids)
+                    risk_level = _LVL_HIGH if critical_count else _LVL_MED
                     
                     conflicts.append({
                         'resource': resource,
                         'conflicting_tasks': group,
-                        'critical_tasks': len(critical_tasks),
+                        'critical_tasks': critical_count,
                         'risk_level': risk_level
                     })
         
@@ -402,31 +502,28 @@ class RiskDetector:
         # might be scheduled in parallel
         parallel_groups = []
         
-        # Create a set of all task IDs in the task list
-        task_ids = {task.get('id') for task in tasks}
-        
-        # Group tasks that don't depend on each other
-        remaining_tasks = tasks.copy()
+        # Predecessor sets are built once per task rather than once per comparison
+        remaining = [(task, task.get('id'), set(task.get('predecesseurs', []))) for task in tasks]
         
-        while remaining_tasks:
-            group = []
-            task = remaining_tasks.pop(0)
-            group.append(task)
+        # Each round groups the first remaining task with every task independent
+        # of it; only tasks dependent on it carry over, so no list is rescanned
+        while remaining:
+            task, task_id, task_dependencies = remaining[0]
+            group = [task]
+            dependent = []
             
-            task_dependencies = set(task.get('predecesseurs', []))
-            task_id = task.get('id')
-            
-            for other_task in remaining_tasks.copy():
-                other_id = other_task.get('id')
-                other_dependencies = set(other_task.get('predecesseurs', []))
+            for other in remaining[1:]:
+                other_task, other_id, other_dependencies = other
                 
                 # If neither task depends on the other, they might be parallel
                 if task_id not in other_dependencies and other_id not in task_dependencies:
                     group.append(other_task)
-                    remaining_tasks.remove(other_task)
-                    
+                else:
+                    dependent.append(other)
+            
             if len(group) > 1:
                 parallel_groups.append(group)
+            remaining = dependent
                 
         return parallel_groups
     
@@ -439,70 +536,21 @@ class RiskDetector:
         Returns:
             dict: Risk metrics
         """
-        # Count risks by level
-        high_risks = 0
-        medium_risks = 0
-        low_risks = 0
-        
-        # Helper function to count risks by level
-        def count_risk_levels(risk_list):
-            nonlocal high_risks, medium_risks, low_risks
-            for risk in risk_list:
-                level = risk.get('risk_level', '')
-                if level == "Élevé":
-                    high_risks += 1
-                elif level == "Moyen":
-                    medium_risks += 1
-                else:
-                    low_risks += 1
-        
-        # Count risks by level for each risk type
-        for risk_list in [no_resources, no_dependencies, bottlenecks]:
-            count_risk_levels(risk_list)
-            
-        # Count overloaded resources
-        for risk in overloaded_resources:
-            level = risk.get('risk_level', '')
-            if level == "Élevé":
-                high_risks += 1
-            elif level == "Moyen":
-                medium_risks += 1
-            else:
-                low_risks += 1
-        
-        # Count timeline risks
-        for risk in timeline_risks:
-            level = risk.get('risk_level', '')
-            if level == "Élevé":
-                high_risks += 1
-            elif level == "Moyen":
-                medium_risks += 1
-            else:
-                low_risks += 1
-        
-        # Count dependency conflicts
-        for risk in dependency_conflicts:
-            level = risk.get('risk_level', '')
-            if level == "Élevé":
-                high_risks += 1
-            elif level == "Moyen":
-                medium_risks += 1
-            else:
-                low_risks += 1
-        
-        # Count resource conflicts
-        for risk in resource_conflicts:
-            level = risk.get('risk_level', '')
-            if level == "Élevé":
-                high_risks += 1
-            elif level == "Moyen":
-                medium_risks += 1
-            else:
-                low_risks += 1
+        # Count risks by level across every risk type in a single pass
+        level_counts = Counter(
+            risk.get('risk_level', '')
+            for risk in chain(no_resources, no_dependencies, bottlenecks,
+                              overloaded_resources, timeline_risks,
+                              dependency_conflicts, resource_conflicts)
+        )
+        high_risks = level_counts[_LVL_HIGH]
+        medium_risks = level_counts[_LVL_MED]
+        low_risks = sum(level_counts.values()) - high_risks - medium_risks
         
         total_critical_path_risks = sum(
             1 for risk in no_resources + bottlenecks if risk.get('id') in self.critical_path_ids
         )
+        task_count = len(self.tasks)
         
         return {
             "risk_levels": {
@@ -511,8 +559,8 @@ class RiskDetector:
                 "low": low_risks
             },
             "critical_path_risk_count": total_critical_path_risks,
-            "resource_risk_ratio": len(no_resources) / len(self.tasks) if self.tasks else 0,
-            "dependency_risk_ratio": len(no_dependencies) / len(self.tasks) if self.tasks else 0,
+            "resource_risk_ratio": len(no_resources) / task_count if task_count else 0,
+            "dependency_risk_ratio": len(no_dependencies) / task_count if task_count else 0,
             "total_risk_score": high_risks * 3 + medium_risks * 2 + low_risks
         }
     
@@ -567,14 +615,15 @@ class RiskDetector:
             dict: Risk counts by type
         """
         # Count all risks we've identified
+        risks = self._get_risks()
         return {
-            "Resource Allocation": len(self._tasks_without_resources()),
-            "Dependencies": len(self._tasks_without_dependencies()),
-            "Bottlenecks": len(self._detect_bottlenecks()),
-            "Overallocated Resources": len(self._detect_overloaded_resources()),
-            "Timeline Issues": len(self._detect_timeline_risks()),
-            "Dependency Conflicts": len(self._detect_dependency_conflicts()),
-            "Resource Conflicts": len(self._detect_resource_allocation_conflicts())
+            "Resource Allocation": len(risks["no_resources"]),
+            "Dependencies": len(risks["no_dependencies"]),
+            "Bottlenecks": len(risks["bottlenecks"]),
+            "Overallocated Resources": len(risks["overloaded_resources"]),
+            "Timeline Issues": len(risks["timeline_risks"]),
+            "Dependency Conflicts": len(risks["dependency_conflicts"]),
+            "Resource Conflicts": len(risks["resource_conflicts"])
         }
     
     def _generate_timeline_risk_projection(self):
@@ -586,35 +635,48 @@ class RiskDetector:
         """
         # This is a simplified model - in a real application, you'd use
         # more complex risk propagation models
-        time_points = ["Project Start", "25%", "50%", "75%", "Project End"]
+        total_risks = sum(len(risk_list) for risk_list in self._get_risks().values())
         
         # Calculate risk impact at different project stages
-        risk_impact = []
-        
-        # Total number of risks
-        total_risks = len(self._tasks_without_resources()) + \
-                     len(self._tasks_without_dependencies()) + \
-                     len(self._detect_bottlenecks()) + \
-                     len(self._detect_overloaded_resources()) + \
-                     len(self._detect_timeline_risks()) + \
-                     len(self._detect_dependency_conflicts()) + \
-                     len(self._detect_resource_allocation_conflicts())
-        
-        # Simple model: risks increase until 50% then decrease
-        # This would be more sophisticated in a real application
         if total_risks > 0:
-            risk_impact = [total_risks * 0.5, total_risks * 0.8, total_risks, total_risks * 0.7, total_risks * 0.3]
+            risk_impact = [total_risks * weight for weight in _TIMELINE_WEIGHTS]
         else:
-            risk_impact = [0, 0, 0, 0, 0]
+            risk_impact = [0] * len(_TIMELINE_WEIGHTS)
             
         return {
-            "labels": time_points,
+            "labels": list(_TIME_POINTS),
             "datasets": [{
                 "label": "Projected Risk Impact",
                 "data": risk_impact
             }]
         }
     
+    def _scan_task_level_risks(self):
+        """
+        Count per-task risks (missing resources, long duration on the critical path)
+        in a single pass, aggregated by status and by critical path membership
+        
+        Returns:
+            tuple: (risk count by status, critical path risks, non-critical path risks)
+        """
+        if self._task_level_risks is not None:
+            return self._task_level_risks
+        
+        risk_counts = self._task_scan[2]
+        critical_risks = int(risk_counts[self._critical_mask].sum())
+        non_critical_risks = int(risk_counts[~self._critical_mask].sum())
+        
+        # Count risks by task status, over the tasks that have any
+        rows = np.flatnonzero(risk_counts)
+        per_task = zip([self.tasks[i].get('statut', '') for i in rows.tolist()],
+                       risk_counts[rows].tolist())
+        status_risks = Counter()
+        for status, risk_count in per_task:
+            status_risks[status] += risk_count
+        
+        self._task_level_risks = (status_risks, critical_risks, non_critical_risks)
+        return self._task_level_risks
+    
     def _generate_risk_distribution(self):
         """
         Generate data showing distribution of risks across the project
@@ -622,27 +684,7 @@ class RiskDetector:
         Returns:
             dict: Risk distribution data
         """
-        # Count risks by task status
-        status_risks = defaultdict(int)
-        
-        for task in self.tasks:
-            task_id = task.get('id')
-            status = task.get('statut', '')
-            
-            # Count risks for this task
-            risk_count = 0
-            
-            # Check if task has resource issues
-            resources = task.get('ressources_requises', [])
-            if not resources or all(not r for r in resources):
-                risk_count += 1
-            
-            # Check if task is a bottleneck
-            if task_id in self.critical_path_ids and task.get('duree_estimee', 0) > 10:
-                risk_count += 1
-                
-            if risk_count > 0:
-                status_risks[status] += risk_count
+        status_risks = self._scan_task_level_risks()[0]
         
         return {
             "labels": list(status_risks.keys()),
@@ -659,30 +701,7 @@ class RiskDetector:
         Returns:
             dict: Critical path risk analysis
         """
-        critical_risks = 0
-        non_critical_risks = 0
-        
-        for task in self.tasks:
-            task_id = task.get('id')
-            is_critical = task_id in self.critical_path_ids
-            
-            # Count risks for this task
-            risk_count = 0
-            
-            # Check if task has resource issues
-            resources = task.get('ressources_requises', [])
-            if not resources or all(not r for r in resources):
-                risk_count += 1
-            
-            # Check if task is a bottleneck
-            if is_critical and task.get('duree_estimee', 0) > 10:
-                risk_count += 1
-                
-            # Add to appropriate counter
-            if is_critical:
-                critical_risks += risk_count
-            else:
-                non_critical_risks += risk_count
+        _, critical_risks, non_critical_risks = self._scan_task_level_risks()
         
         return {
             "labels": ["Critical Path Tasks", "Non-Critical Path Tasks"],